@@ -0,0 +1,188 @@
+from array import array
+from operator import itemgetter
+
+from zobrist import zobrist_keys
+
+# Directions the blank can travel, in the same order solver.moves() generates children
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+DIRECTION_NAMES = ('up', 'down', 'left', 'right')
+INVERSE = (DOWN, UP, RIGHT, LEFT)
+
+_by_delta = itemgetter(2)
+
+_tables = {}
+
+def standard_goal(n):
+    # 1, 2, ..., n*n - 1 in reading order with the blank last
+    return tuple(range(1, n * n)) + (0,)
+
+class BoardTables:
+    # Lookup tables shared by every board of one size and goal, built once by board_tables(n, goal)
+    def __init__(self, n, goal=None):
+        size = n * n
+        self.n = n
+        self.size = size
+        self.goal = array('H', standard_goal(n) if goal is None else goal)
+        if sorted(self.goal) != list(range(size)):
+            raise ValueError(f"not a valid {n}x{n} goal: {list(self.goal)}")
+        # goal_position[tile] is the square tile belongs on
+        self.goal_position = array('H', bytes(2 * size))
+        for pos, tile in enumerate(self.goal):
+            self.goal_position[tile] = pos
+
+        # distance[tile * size + pos] is the Manhattan distance of tile at pos from its goal square
+        self.distance = array('H', bytes(2 * size * size))
+        for tile in range(1, size):
+            goal_x, goal_y = divmod(self.goal_position[tile], n)
+            for pos in range(size):
+                curr_x, curr_y = divmod(pos, n)
+                self.distance[tile * size + pos] = abs(goal_x - curr_x) + abs(goal_y - curr_y)
+
+        if goal is not None:
+            # Moves and hash keys depend only on the size, so they are shared with the standard goal
+            standard = board_tables(n)
+            self.neighbours = standard.neighbours
+            self.offsets = standard.offsets
+            self.zobrist = standard.zobrist
+            return
+
+        # neighbours[pos] lists (direction, new blank position) for every legal blank move
+        self.neighbours = []
+        for pos in range(size):
+            i, j = divmod(pos, n)
+            options = []
+            if i > 0:
+                options.append((UP, pos - n))
+            if i < n - 1:
+                options.append((DOWN, pos + n))
+            if j > 0:
+                options.append((LEFT, pos - 1))
+            if j < n - 1:
+                options.append((RIGHT, pos + 1))
+            self.neighbours.append(tuple(options))
+        self.offsets = (-n, n, -1, 1)
+
+        self.zobrist = zobrist_keys(n)
+
+def board_tables(n, goal=None):
+    """Tables for n x n boards solved towards goal, a flat tile sequence (the standard goal when None)."""
+    if goal is not None:
+        goal = tuple(goal)
+        if goal == standard_goal(n):
+            goal = None
+    tables = _tables.get((n, goal))
+    if tables is None:
+        tables = _tables[(n, goal)] = BoardTables(n, goal)
+    return tables
+
+class Board:
+    """Flat n x n board that keeps blank position, misplaced count, Manhattan distance and Zobrist hash up to date on every move."""
+
+    __slots__ = ('n', 'tables', 'tiles', 'blank', 'misplaced', 'manhattan', 'hash')
+
+    def __init__(self, n, tiles, goal=None):
+        self.n = n
+        self.tables = board_tables(n, goal)
+        self.tiles = array('B' if n * n <= 256 else 'H', tiles)
+        self.blank = self.tiles.index(0)
+
+        size = self.tables.size
+        goal, distance, zobrist = self.tables.goal, self.tables.distance, self.tables.zobrist
+        self.misplaced = 0
+        self.manhattan = 0
+        self.hash = 0
+        for pos, tile in enumerate(self.tiles):
+            if tile == 0:
+                continue  # The blank is not counted, and its position is implied by the other tiles
+            if tile != goal[pos]:
+                self.misplaced += 1
+            self.manhattan += distance[tile * size + pos]
+            self.hash ^= zobrist[tile * size + pos]
+
+    @classmethod
+    def from_state(cls, state, goal=None):
+        # goal may be nested rows like state, or flat
+        if goal is not None and isinstance(goal[0], list):
+            goal = [tile for row in goal for tile in row]
+        return cls(len(state), [tile for row in state for tile in row], goal)
+
+    def to_state(self):
+        n = self.n
+        return [list(self.tiles[i:i + n]) for i in range(0, n * n, n)]
+
+    def copy(self):
+        board = Board.__new__(Board)
+        board.n = self.n
+        board.tables = self.tables
+        board.tiles = array(self.tiles.typecode, self.tiles)
+        board.blank = self.blank
+        board.misplaced = self.misplaced
+        board.manhattan = self.manhattan
+        board.hash = self.hash
+        return board
+
+    def is_solved(self):
+        return self.misplaced == 0
+
+    def can_slide(self, pos):
+        # A tile can slide if it is orthogonally next to the blank
+        blank_i, blank_j = divmod(self.blank, self.n)
+        i, j = divmod(pos, self.n)
+        return abs(blank_i - i) + abs(blank_j - j) == 1
+
+    def slide(self, pos):
+        """Slide the tile at pos into the blank and return it. The caller must check can_slide() first."""
+        tables = self.tables
+        size = tables.size
+        tiles = self.tiles
+        blank = self.blank
+        tile = tiles[pos]
+
+        goal_tile = tables.goal
+        self.misplaced += (goal_tile[blank] != tile) - (goal_tile[pos] != tile)
+        self.manhattan += tables.distance[tile * size + blank] - tables.distance[tile * size + pos]
+        self.hash ^= tables.zobrist[tile * size + pos] ^ tables.zobrist[tile * size + blank]
+
+        tiles[blank] = tile
+        tiles[pos] = 0
+        self.blank = pos
+        return tile
+
+    def move(self, direction):
+        """Move the blank one square in direction (UP, DOWN, LEFT or RIGHT) and return the tile it swapped with."""
+        pos = self.blank + self.tables.offsets[direction]
+        if not 0 <= pos < self.tables.size or not self.can_slide(pos):
+            raise ValueError(f"cannot move the blank {DIRECTION_NAMES[direction]}")
+        return self.slide(pos)
+
+    def legal_moves(self):
+        return self.tables.neighbours[self.blank]
+
+    def successors(self, last_move=None):
+        """List (move, tile, delta_h) for each child, best Manhattan change first, without building the child boards.
+
+        The move that would undo last_move is skipped. Ties keep the up/down/left/right order.
+        """
+        tables = self.tables
+        size = tables.size
+        distance = tables.distance
+        tiles = self.tiles
+        blank = self.blank
+        skip = INVERSE[last_move] if last_move is not None else None
+        children = []
+        for direction, pos in tables.neighbours[blank]:
+            if direction == skip:
+                continue
+            tile = tiles[pos]
+            children.append((direction, tile, distance[tile * size + blank] - distance[tile * size + pos]))
+        children.sort(key=_by_delta)
+        return children
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and self.hash == other.hash and self.tiles == other.tiles
+
+    def __hash__(self):
+        return self.hash
+
+    def __repr__(self):
+        return f"Board({self.n}, {list(self.tiles)})"
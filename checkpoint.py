@@ -0,0 +1,137 @@
+import os
+import queue
+import struct
+import threading
+import time
+
+# Checkpoint files for long IDA* runs. A snapshot is the start board and goal, the current threshold,
+# the smallest f seen above it so far, the DFS position (the move path plus the next child index at
+# the deepest level) and the running stats. It is a few hundred bytes, so taking one costs the search
+# almost nothing; packing and writing happen on a background thread.
+#
+# Layout (little endian): magic, n, tiles (n * n bytes), goal (n * n bytes), bound, next bound,
+# max depth, iteration, next child index, expanded nodes, elapsed seconds, path length, path packed
+# 4 moves per byte.
+
+MAGIC = b'IDA2'
+NO_LIMIT = 0xFFFFFFFF  # stands for an infinite next bound or no max depth
+_HEADER = struct.Struct('<IIIIBQdI')
+
+class IDASnapshot:
+    __slots__ = ('n', 'tiles', 'goal', 'bound', 'next_bound', 'max_depth', 'iteration', 'next_index',
+                 'expanded_nodes', 'elapsed', 'path')
+
+    def __init__(self, n, tiles, goal, bound, next_bound, max_depth, iteration, next_index, expanded_nodes, elapsed, path):
+        self.n = n
+        self.tiles = bytes(tiles)
+        self.goal = bytes(goal)
+        self.bound = bound
+        self.next_bound = next_bound
+        self.max_depth = max_depth
+        self.iteration = iteration
+        self.next_index = next_index
+        self.expanded_nodes = expanded_nodes
+        self.elapsed = elapsed
+        self.path = path
+
+def pack_snapshot(snapshot):
+    moves = bytearray((len(snapshot.path) + 3) // 4)
+    for i, move in enumerate(snapshot.path):
+        moves[i >> 2] |= move << ((i & 3) * 2)
+    next_bound = NO_LIMIT if snapshot.next_bound == float('inf') else snapshot.next_bound
+    max_depth = NO_LIMIT if snapshot.max_depth is None else snapshot.max_depth
+    return b''.join((
+        MAGIC,
+        bytes((snapshot.n,)),
+        snapshot.tiles,
+        snapshot.goal,
+        _HEADER.pack(snapshot.bound, next_bound, max_depth, snapshot.iteration, snapshot.next_index,
+                     snapshot.expanded_nodes, snapshot.elapsed, len(snapshot.path)),
+        bytes(moves),
+    ))
+
+def unpack_snapshot(data):
+    if data[:4] != MAGIC:
+        raise ValueError("not an IDA* checkpoint file")
+    n = data[4]
+    offset = 5 + 2 * n * n
+    tiles = data[5:5 + n * n]
+    goal = data[5 + n * n:offset]
+    bound, next_bound, max_depth, iteration, next_index, expanded_nodes, elapsed, path_length = \
+        _HEADER.unpack_from(data, offset)
+    moves = data[offset + _HEADER.size:]
+    if len(moves) != (path_length + 3) // 4:
+        raise ValueError("truncated IDA* checkpoint file")
+    path = [(moves[i >> 2] >> ((i & 3) * 2)) & 3 for i in range(path_length)]
+    return IDASnapshot(n, tiles, goal, bound, float('inf') if next_bound == NO_LIMIT else next_bound,
+                       None if max_depth == NO_LIMIT else max_depth, iteration, next_index,
+                       expanded_nodes, elapsed, path)
+
+def read_checkpoint(path):
+    with open(path, 'rb') as f:
+        return unpack_snapshot(f.read())
+
+def write_atomic(path, data):
+    # Write beside the target and rename over it, so a crash leaves either the old file or the new one
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class CheckpointWriter:
+    """Writes snapshots to path on a background thread, at most one every interval seconds.
+
+    The search calls due() cheaply and submit() when it is; only the newest pending snapshot is kept.
+    If a write fails, writing stops and the error is raised from the next submit() or close().
+    """
+
+    def __init__(self, path, interval=60.0):
+        self.path = path
+        self.interval = interval
+        self.written = 0
+        self.error = None
+        self._next_time = time.monotonic() + interval
+        self._queue = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def due(self):
+        return time.monotonic() >= self._next_time
+
+    def submit(self, snapshot):
+        self._raise_error()
+        self._next_time = time.monotonic() + self.interval
+        try:
+            self._queue.get_nowait()  # Drop a snapshot that was never written in favour of this one
+        except queue.Empty:
+            pass
+        self._queue.put(snapshot)
+
+    def close(self):
+        # The thread stops on a failed write, so never wait on a full queue nobody will drain
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while True:
+            snapshot = self._queue.get()
+            if snapshot is None:
+                return
+            try:
+                write_atomic(self.path, pack_snapshot(snapshot))
+            except OSError as error:
+                self.error = error
+                return
+            self.written += 1
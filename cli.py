@@ -0,0 +1,135 @@
+import time
+
+START_TIME = time.perf_counter()  # Taken before the solver import so startup cost is included
+
+import argparse
+import math
+import sys
+
+from board import Board
+from optimizer import optimize_path
+from checkpoint import read_checkpoint
+from search import ida_star, moves_to_states, resume_ida_star
+from smastar import sma_star
+from solver import check_puzzle, generate_random_puzzle, is_solvable, Manhattan_heuristic, solvePuzzle
+
+# Headless solver: no pygame, no display.
+# Puzzles are given as flat tile lists, e.g. "1,2,3,4,5,6,7,0,8" or "1 2 3 4 5 6 7 0 8", with 0 as the blank.
+
+def parse_puzzle(text):
+    tiles = [int(tile) for tile in text.replace(',', ' ').split()]
+    n = math.isqrt(len(tiles))
+    puzzle = [tiles[i:i + n] for i in range(0, n * n, n)]
+    try:
+        check_puzzle(puzzle)
+    except ValueError:
+        raise ValueError(f"not a valid sliding puzzle: {text!r}") from None
+    return puzzle
+
+def format_puzzle(puzzle):
+    return ' '.join(str(tile) for row in puzzle for tile in row)
+
+def parse_each(texts):
+    # A malformed puzzle is reported in the results and skipped, so the rest of the batch still runs
+    for text in texts:
+        try:
+            yield parse_puzzle(text)
+        except ValueError:
+            print(f"{text.strip()}: invalid")
+
+def read_puzzles(args):
+    if args.random:
+        for _ in range(args.random):
+            yield generate_random_puzzle(args.size, args.goal)
+    elif args.puzzles:
+        yield from parse_each(args.puzzles)
+    else:
+        yield from parse_each(line for line in sys.stdin if line.strip())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve sliding puzzles without opening a window.")
+    parser.add_argument('puzzles', nargs='*', help="puzzles to solve; read one per line from stdin when omitted")
+    parser.add_argument('--random', type=int, metavar='COUNT', help="solve COUNT randomly generated puzzles instead")
+    parser.add_argument('--size', type=int, default=3, help="board size for --random (default: 3)")
+    parser.add_argument('--goal', type=parse_puzzle, help="goal layout in the same format as a puzzle "
+                                                          "(default: 1 2 ... with the blank last)")
+    parser.add_argument('--engine', choices=('astar', 'ida', 'sma'), default='astar',
+                        help="astar: the GUI's best-first search; ida: optimal IDA*; "
+                             "sma: optimal memory-bounded SMA* (default: astar)")
+    parser.add_argument('--max-nodes', type=int, default=100000, help="node cap for --engine sma (default: 100000)")
+    parser.add_argument('--max-mb', type=float, help="memory cap in MB for --engine sma, instead of --max-nodes")
+    parser.add_argument('--checkpoint', metavar='FILE', help="with --engine ida, save the search position to FILE periodically")
+    parser.add_argument('--checkpoint-interval', type=float, default=60.0, help="seconds between checkpoints (default: 60)")
+    parser.add_argument('--resume', metavar='FILE', help="continue the --engine ida run saved in FILE and exit")
+    parser.add_argument('--optimize', action='store_true', help="shorten the solution with the path optimizer")
+    parser.add_argument('--steps', action='store_true', help="print every state of the solution")
+    args = parser.parse_args(argv)
+    if args.goal and args.resume:
+        parser.error("--resume uses the goal saved in the checkpoint")
+    if args.checkpoint and args.engine != 'ida':
+        parser.error("--checkpoint only works with --engine ida")
+    if args.goal and args.random:
+        args.size = len(args.goal)
+
+    if args.resume:
+        snapshot = read_checkpoint(args.resume)
+        puzzle = [list(snapshot.tiles[i:i + snapshot.n]) for i in range(0, snapshot.n ** 2, snapshot.n)]
+        print(f"resuming {format_puzzle(puzzle)} at threshold {snapshot.bound}, "
+              f"{snapshot.expanded_nodes} nodes expanded", file=sys.stderr)
+        solution_moves, steps = resume_ida_star(args.resume, args.checkpoint_interval)
+        print(f"{format_puzzle(puzzle)}: {len(solution_moves)} moves, {steps} nodes expanded")
+        if args.steps:
+            for state in moves_to_states(puzzle, solution_moves)[1:]:
+                print(f"  {format_puzzle(state)}")
+        return 0
+
+    first_result_time = None
+    solved = 0
+    for puzzle in read_puzzles(args):
+        n = len(puzzle)
+        if args.goal and len(args.goal) != n:
+            print(f"{format_puzzle(puzzle)}: not the size of the goal")
+            continue
+        if not is_solvable(puzzle, args.goal):
+            print(f"{format_puzzle(puzzle)}: unsolvable")
+            continue
+
+        if args.engine == 'ida':
+            solution_moves, steps = ida_star(Board.from_state(puzzle, args.goal), checkpoint=args.checkpoint,
+                                             checkpoint_interval=args.checkpoint_interval)
+            solution_steps = moves_to_states(puzzle, solution_moves)
+        elif args.engine == 'sma':
+            max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb else None
+            solution_moves, stats = sma_star(Board.from_state(puzzle, args.goal), args.max_nodes, max_bytes)
+            steps = stats['expanded']
+            if stats['regenerated']:
+                print(f"{format_puzzle(puzzle)}: node cap of {stats['max_nodes']} forced "
+                      f"{stats['regenerated']} re-expansions", file=sys.stderr)
+            if solution_moves is None:
+                print(f"{format_puzzle(puzzle)}: no solution fits in {stats['max_nodes']} nodes")
+                continue
+            solution_steps = moves_to_states(puzzle, solution_moves)
+        else:
+            stats = {}
+            steps, frontierSize, solutions = solvePuzzle(n, puzzle, Manhattan_heuristic, args.goal, stats)
+            print(f"{format_puzzle(puzzle)}: closed set holds {stats['closed_states']} states in "
+                  f"{stats['closed_bytes']} bytes ({stats['closed_bytes_per_state']:.1f} bytes/state)", file=sys.stderr)
+            solution_steps = solutions[1:]
+        if args.optimize:
+            solution_steps = optimize_path(solution_steps)
+        print(f"{format_puzzle(puzzle)}: {len(solution_steps) - 1} moves, {steps} nodes expanded")
+        if args.steps:
+            for state in solution_steps[1:]:
+                print(f"  {format_puzzle(state)}")
+        solved += 1
+
+        if first_result_time is None:
+            first_result_time = time.perf_counter()
+            print(f"time to first result: {(first_result_time - START_TIME) * 1000:.1f} ms", file=sys.stderr)
+
+    total_time = time.perf_counter() - START_TIME
+    print(f"solved {solved} puzzle(s) in {total_time * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import time
+
+from realtime import RealTimeSearch
+
+# Next-move hints for manual play, answered within a frame budget of a few milliseconds.
+#
+# Work is kept between hints in two places. Once a full solution is found every state on it is
+# remembered with its next move, so a player who follows the hints gets each later one in O(1).
+# Lower bounds learned about other states (from IDA* iterations that ran out of time, and from the
+# LRTA* minimin lookahead that picks the move when they do) are cached by Zobrist hash, so searches
+# around the player's recent positions start from better estimates instead of the bare Manhattan
+# distance.
+
+class _OutOfTime(Exception):
+    pass
+
+class HintEngine:
+    def __init__(self, budget=0.004, max_learned=200000, lookahead_nodes=300):
+        self.budget = budget
+        self.lookahead_nodes = lookahead_nodes  # minimin nodes once IDA* runs out, about a third of budget
+        self.max_learned = max_learned
+        self.plan = {}     # zobrist key -> next move, for every state on the last solution found
+        self.learned = {}  # zobrist key -> admissible lower bound on the distance to the goal
+        self.hits = 0
+        self.searches = 0
+
+    def reset(self):
+        # Call when a new puzzle is dealt; nothing learned about the old one carries over
+        self.plan.clear()
+        self.learned.clear()
+
+    def hint(self, board):
+        """Return (move, tile) for the best next move on board, or None if it is already solved.
+
+        move is the direction the blank travels and tile is the tile that slides into it.
+        """
+        if board.is_solved():
+            return None
+        move = self.plan.get(board.hash)
+        if move is None:
+            self.searches += 1
+            # IDA* leaves room for the lookahead that picks the move if it runs out of time
+            deadline = time.perf_counter() + self.budget * 2 / 3
+            board = board.copy()
+            try:
+                move = self._solve(board, deadline)
+            except _OutOfTime:
+                move = self._lookahead(board)
+        else:
+            self.hits += 1
+        return move, board.tiles[board.blank + board.tables.offsets[move]]
+
+    def _estimate(self, board):
+        learned = self.learned.get(board.hash, 0)
+        return learned if learned > board.manhattan else board.manhattan
+
+    def _learn(self, key, value):
+        if len(self.learned) >= self.max_learned:
+            self.learned.clear()
+        if value > self.learned.get(key, 0):
+            self.learned[key] = value
+
+    def _solve(self, board, deadline):
+        # IDA* on the learned estimates; raises _OutOfTime once the deadline passes
+        offsets = board.tables.offsets
+        path = []
+        visited_nodes = 0
+
+        def search(g, bound, last_move):
+            # Every call counts towards the clock check, including children cut off above bound,
+            # since those are most of an IDA* iteration's work
+            nonlocal visited_nodes
+            visited_nodes += 1
+            if visited_nodes & 7 == 0 and time.perf_counter() > deadline:
+                raise _OutOfTime
+            f = g + self._estimate(board)
+            if f > bound:
+                return f
+            if board.manhattan == 0:
+                return -1
+
+            next_bound = float('inf')
+            for move, tile, delta_h in board.successors(last_move):
+                blank = board.blank
+                board.slide(blank + offsets[move])
+                path.append(move)
+                t = search(g + 1, bound, move)
+                if t == -1:
+                    return -1
+                path.pop()
+                board.slide(blank)
+                if t < next_bound:
+                    next_bound = t
+            return next_bound
+
+        start_key = board.hash
+        bound = self._estimate(board)
+        while True:
+            try:
+                t = search(0, bound, None)
+            except _OutOfTime:
+                # Every iteration below bound failed, so bound is a lower bound on the distance
+                self._undo(board, path)
+                self._learn(start_key, bound)
+                raise
+            if t == -1:
+                break
+            bound = t
+
+        # Remember the whole solution so the following hints along it are lookups
+        self._undo(board, path)
+        for move in path:
+            self.plan[board.hash] = move
+            board.slide(board.blank + offsets[move])
+        self._undo(board, path)
+        return path[0]
+
+    def _undo(self, board, path):
+        offsets = board.tables.offsets
+        for move in reversed(path):
+            board.slide(board.blank - offsets[move])
+
+    def _lookahead(self, board):
+        # LRTA* minimin lookahead over the learned estimates; step() raises this state's estimate to
+        # the best frontier value, so hints that keep missing the deadline still make progress
+        search = RealTimeSearch(board, node_budget=self.lookahead_nodes)
+        search.learned = self.learned
+        if len(self.learned) >= self.max_learned:
+            self.learned.clear()
+        return search.step()
@@ -1,25 +1,33 @@
 import pygame
 import random
-import numpy as np
 
-# Initialize Pygame
-pygame.init()
+from board import Board
+from hint import HintEngine
+from profiler import profiler_from_env
 
 # Constants
 SCREEN_WIDTH = 400
 SCREEN_HEIGHT = 450
 GRID_SIZE = 3  # You can change this to 3, 5, etc., for different grid sizes
 TILE_SIZE = SCREEN_WIDTH // GRID_SIZE
-FONT = pygame.font.Font(None, 40)
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 BLUE = (0, 0, 255)
 GREEN = (0, 255, 0)
+GOLD = (255, 200, 0)
 FPS = 60
 
-# Create a screen
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption('Sliding Puzzle')
+# The font and window are created by init_pygame() when the game starts, not at import time
+FONT = None
+screen = None
+
+def init_pygame():
+    global FONT, screen
+    if screen is None:
+        pygame.init()
+        FONT = pygame.font.Font(None, 40)
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption('Sliding Puzzle')
 
 # Create a new puzzle by shuffling tiles
 def generate_puzzle():
@@ -43,7 +51,7 @@ def is_solvable(puzzle):
     return inversions % 2 == 0
 
 # Draw the puzzle on the screen
-def draw_puzzle(puzzle, moving_tile=None, move_offset=(0, 0), turns=0):
+def draw_puzzle(puzzle, moving_tile=None, move_offset=(0, 0), turns=0, hint_tile=None):
     screen.fill(WHITE)
 
     for i in range(GRID_SIZE):
@@ -57,6 +65,8 @@ def draw_puzzle(puzzle, moving_tile=None, move_offset=(0, 0), turns=0):
                     tile_rect.move_ip(move_offset)
 
                 pygame.draw.rect(screen, BLUE, tile_rect)
+                if tile == hint_tile:
+                    pygame.draw.rect(screen, GOLD, tile_rect, width=4)
                 text = FONT.render(str(tile), True, WHITE)
                 screen.blit(text, (tile_rect.x + TILE_SIZE // 3, tile_rect.y + TILE_SIZE // 3))
 
@@ -102,16 +112,25 @@ def is_solved(puzzle):
 
 # Main game loop
 def main():
+    init_pygame()
     clock = pygame.time.Clock()
     running = True
     puzzle = generate_puzzle()  # Initialize a random puzzle
     turns = 0  # Initialize turn counter
+    hints = HintEngine()
+    hint_tile = None  # Tile suggested by the last hint (press H)
+    profiler = profiler_from_env()  # PUZZLE_PROFILE=1 turns on the frame-time overlay and trace
 
     while running:
+        profiler.begin_frame()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
 
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                hint = hints.hint(Board(GRID_SIZE, puzzle))
+                hint_tile = hint[1] if hint is not None else None
+
             if event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_x, mouse_y = pygame.mouse.get_pos()
 
@@ -119,15 +138,21 @@ def main():
                 if SCREEN_WIDTH // 3 < mouse_x < 2 * SCREEN_WIDTH // 3 and SCREEN_HEIGHT - 40 < mouse_y < SCREEN_HEIGHT:
                     puzzle = generate_puzzle()  # Generate a new random puzzle
                     turns = 0  # Reset turn counter when new puzzle is generated
+                    hints.reset()
+                    hint_tile = None
 
                 # Check if a tile is clicked to move
                 elif mouse_y < SCREEN_HEIGHT - 50:  # Exclude clicks on the "Start" button
                     row = mouse_y // TILE_SIZE
                     col = mouse_x // TILE_SIZE
-                    if move_tile_with_animation(puzzle, row, col, clock):
+                    with profiler.phase('animate'):
+                        moved = move_tile_with_animation(puzzle, row, col, clock)
+                    if moved:
                         turns += 1  # Increment turn count after a successful move
+                        hint_tile = None
 
-        draw_puzzle(puzzle, turns=turns)
+        with profiler.phase('draw'):
+            draw_puzzle(puzzle, turns=turns, hint_tile=hint_tile)
 
         # Check if the puzzle is solved
         if is_solved(puzzle):
@@ -135,9 +160,13 @@ def main():
             win_text = FONT.render("You Win!", True, GREEN)
             screen.blit(win_text, (SCREEN_WIDTH // 2 - 50, SCREEN_HEIGHT // 2))
 
-        pygame.display.flip()
-        clock.tick(FPS)
+        profiler.draw_overlay(screen)
+        with profiler.phase('flip'):
+            pygame.display.flip()
+        with profiler.phase('tick'):
+            clock.tick(FPS)
 
+    profiler.dump()
     pygame.quit()
 
 if __name__ == '__main__':
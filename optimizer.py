@@ -0,0 +1,103 @@
+import time
+
+from board import board_tables
+from zobrist import hash_state
+
+# Post-processing for solutions that are valid but not optimal, such as the greedy Astar paths or a
+# player's move history. A path is a list of nested-list states, each one move from the previous.
+
+def remove_cycles(states):
+    """Cut out every loop: when a state comes back, everything since its first visit is dropped."""
+    path = []
+    seen = {}  # zobrist key -> index in path
+    for state in states:
+        key = hash_state(state)
+        index = seen.get(key)
+        if index is not None and path[index] == state:
+            for dropped in path[index + 1:]:
+                del seen[hash_state(dropped)]
+            del path[index + 1:]
+        else:
+            seen[key] = len(path)
+            path.append(state)
+    return path
+
+def _flat(state):
+    return tuple(tile for row in state for tile in row)
+
+def _expand(frontier, parents, neighbours):
+    # Grow one BFS layer; parents maps each reached state to the state it was reached from
+    layer = []
+    for tiles in frontier:
+        blank = tiles.index(0)
+        for direction, pos in neighbours[blank]:
+            child = list(tiles)
+            child[blank], child[pos] = child[pos], 0
+            child = tuple(child)
+            if child not in parents:
+                parents[child] = tiles
+                layer.append(child)
+    return layer
+
+def shortest_between(start, goal, max_moves):
+    """Shortest path from start to goal of at most max_moves moves, as flat tuples, or None.
+
+    Bidirectional breadth-first search, so a window of k moves costs about two searches of depth k/2.
+    """
+    n = len(start)
+    neighbours = board_tables(n).neighbours
+    start, goal = _flat(start), _flat(goal)
+    if start == goal:
+        return [start]
+
+    forward, backward = {start: None}, {goal: None}
+    forward_layer, backward_layer = [start], [goal]
+    depth = 0
+    while depth < max_moves and forward_layer and backward_layer:
+        # Grow the smaller side; stop at the first layer that touches the other side
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer = _expand(forward_layer, forward, neighbours)
+            meeting = [tiles for tiles in forward_layer if tiles in backward]
+        else:
+            backward_layer = _expand(backward_layer, backward, neighbours)
+            meeting = [tiles for tiles in backward_layer if tiles in forward]
+        depth += 1
+        if meeting:
+            middle = meeting[0]
+            path = []
+            tiles = middle
+            while tiles is not None:
+                path.append(tiles)
+                tiles = forward[tiles]
+            path.reverse()
+            tiles = backward[middle]
+            while tiles is not None:
+                path.append(tiles)
+                tiles = backward[tiles]
+            return path
+    return None
+
+def optimize_path(states, window=12, time_budget=0.05):
+    """Return a path with the same ends as states that is never longer.
+
+    Loops are removed first. Then every window of `window` moves is re-solved optimally and replaced
+    when a shorter segment exists, sweeping until a pass finds nothing or time_budget seconds are used.
+    """
+    deadline = time.perf_counter() + time_budget
+    n = len(states[0]) if states else 0
+    path = remove_cycles(states)
+
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        i = 0
+        while i < len(path) - 2 and time.perf_counter() < deadline:
+            end = min(i + window, len(path) - 1)
+            segment = shortest_between(path[i], path[end], end - i - 1)
+            if segment is not None:
+                path[i:end + 1] = [[list(tiles[r:r + n]) for r in range(0, n * n, n)] for tiles in segment]
+                improved = True
+            i += 1
+        if improved:
+            path = remove_cycles(path)
+    return path
@@ -0,0 +1,152 @@
+from array import array
+
+# Packed states: every tile gets a fixed bit field, 4 bits per tile up to 4 x 4, so a board of that
+# size is one 64-bit integer (5 x 5 needs 125 bits, so two words). Unlike a Zobrist hash the packed
+# form is exact, and like one it is updated in O(1) when a tile slides.
+#
+# PackedStateSet keeps packed states in an open-addressing hash table with linear probing, stored in
+# an array('Q') of one or more words per slot. There are no per-entry Python objects, so the memory
+# per state is fixed: slot width divided by the load factor, between 11 and 23 bytes for 4 x 4 boards.
+
+MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15  # Fibonacci hashing multiplier
+
+def tile_bits(n):
+    return (n * n - 1).bit_length()
+
+def pack_tiles(tiles, n):
+    bits = tile_bits(n)
+    packed = 0
+    for pos, tile in enumerate(tiles):
+        packed |= tile << (pos * bits)
+    return packed
+
+def pack_state(state):
+    return pack_tiles([tile for row in state for tile in row], len(state))
+
+def unpack_tiles(packed, n):
+    bits = tile_bits(n)
+    field = (1 << bits) - 1
+    return [(packed >> (pos * bits)) & field for pos in range(n * n)]
+
+def slide_packed(packed, n, tile, from_pos, to_pos):
+    """Return the packed state after tile slides from from_pos into the blank at to_pos."""
+    bits = tile_bits(n)
+    return packed + (tile << (to_pos * bits)) - (tile << (from_pos * bits))
+
+def _entries(table, words):
+    if words == 1:
+        for packed in table:
+            if packed:
+                yield packed
+        return
+    for start in range(0, len(table), words):
+        packed = 0
+        for k in range(words):
+            packed |= table[start + k] << (64 * k)
+        if packed:
+            yield packed
+
+class PackedStateSet:
+    """Set of packed n x n states in a flat array('Q') hash table.
+
+    The table doubles whenever it would pass max_load; pass capacity to size it up front when the
+    number of states is known. An empty slot is all zero bits, which no packed board can be.
+    """
+
+    def __init__(self, n, capacity=16, max_load=0.7):
+        self.n = n
+        self.words = (tile_bits(n) * n * n + 63) // 64
+        self.max_load = max_load
+        self.count = 0
+        slots = 16
+        while slots * max_load < capacity:
+            slots *= 2
+        self._allocate(slots)
+
+    def _allocate(self, slots):
+        self.slots = slots
+        self.mask = slots - 1
+        self.shift = 64 - (slots.bit_length() - 1)
+        self.limit = int(slots * self.max_load)
+        self.table = array('Q', bytes(8 * slots * self.words))
+
+    def _slot(self, packed):
+        return ((hash(packed) * _GOLDEN) & MASK64) >> self.shift
+
+    def add(self, packed):
+        """Add packed; returns False if it was already in the set."""
+        if self.count >= self.limit:
+            self._resize()
+        if self._insert(packed):
+            self.count += 1
+            return True
+        return False
+
+    def _insert(self, packed):
+        table, mask = self.table, self.mask
+        i = self._slot(packed)
+        if self.words == 1:
+            while True:
+                value = table[i]
+                if value == packed:
+                    return False
+                if value == 0:
+                    table[i] = packed
+                    return True
+                i = (i + 1) & mask
+
+        words = self.words
+        parts = [(packed >> (64 * k)) & MASK64 for k in range(words)]
+        while True:
+            start = i * words
+            slot = table[start:start + words]
+            if slot.tolist() == parts:
+                return False
+            if not any(slot):
+                table[start:start + words] = array('Q', parts)
+                return True
+            i = (i + 1) & mask
+
+    def __contains__(self, packed):
+        table, mask = self.table, self.mask
+        i = self._slot(packed)
+        if self.words == 1:
+            while True:
+                value = table[i]
+                if value == packed:
+                    return True
+                if value == 0:
+                    return False
+                i = (i + 1) & mask
+
+        words = self.words
+        parts = [(packed >> (64 * k)) & MASK64 for k in range(words)]
+        while True:
+            start = i * words
+            slot = table[start:start + words]
+            if slot.tolist() == parts:
+                return True
+            if not any(slot):
+                return False
+            i = (i + 1) & mask
+
+    def __iter__(self):
+        return _entries(self.table, self.words)
+
+    def _resize(self):
+        # Rehash straight from the old array so no list of every state is built on the way
+        old = self.table
+        self._allocate(self.slots * 2)
+        for packed in _entries(old, self.words):
+            self._insert(packed)
+
+    def __len__(self):
+        return self.count
+
+    def memory_bytes(self):
+        return self.table.itemsize * len(self.table)
+
+    def bytes_per_state(self):
+        """Table bytes divided by stored states; 0.0 while the set is empty."""
+        return self.memory_bytes() / self.count if self.count else 0.0
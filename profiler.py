@@ -0,0 +1,122 @@
+import json
+import os
+import time
+from contextlib import nullcontext
+
+import pygame
+
+# Opt-in frame profiler for the pygame loops. Set PUZZLE_PROFILE=1 to enable it: each frame is split
+# into named phases timed with perf_counter_ns, a small overlay shows FPS, p50/p99 frame times and
+# the average cost of each phase, and a Chrome trace (load it in chrome://tracing or Perfetto) is
+# written to PUZZLE_PROFILE_TRACE, frame_trace.json by default, when the game exits.
+# When disabled every call is a no-op, so the loops can stay instrumented.
+
+OVERLAY_COLOR = (0, 0, 0, 170)
+OVERLAY_TEXT_COLOR = (255, 255, 255)
+MAX_TRACE_EVENTS = 200000  # about an hour at 60 FPS with a handful of phases
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler._record(self.name, self.start, time.perf_counter_ns() - self.start)
+        return False
+
+class FrameProfiler:
+    def __init__(self, enabled=False, trace_path='frame_trace.json', window=300):
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self.window = window          # frames kept for the overlay statistics
+        self.frame_times = []         # ns between consecutive begin_frame() calls
+        self.phase_history = []       # per-frame {phase: ns}, same window
+        self.events = []              # (name, start ns, duration ns) for the trace
+        self._origin = time.perf_counter_ns()
+        self._frame_start = None
+        self._phases = {}
+        self._null = nullcontext()
+        self._font = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        if self._frame_start is not None:
+            self._record('frame', self._frame_start, now - self._frame_start, per_frame=False)
+            self.frame_times.append(now - self._frame_start)
+            self.phase_history.append(self._phases)
+            del self.frame_times[:-self.window]
+            del self.phase_history[:-self.window]
+        self._frame_start = now
+        self._phases = {}
+
+    def phase(self, name):
+        # Use as `with profiler.phase('draw'):`
+        if not self.enabled:
+            return self._null
+        return _Phase(self, name)
+
+    def _record(self, name, start, duration, per_frame=True):
+        if per_frame:
+            self._phases[name] = self._phases.get(name, 0) + duration
+        if len(self.events) < MAX_TRACE_EVENTS:
+            self.events.append((name, start, duration))
+
+    def summary(self):
+        if not self.frame_times:
+            return None
+        frame_times = sorted(self.frame_times)
+        count = len(frame_times)
+        totals = {}
+        for phases in self.phase_history:
+            for name, duration in phases.items():
+                totals[name] = totals.get(name, 0) + duration
+        return {
+            'fps': 1e9 * count / sum(frame_times),
+            'p50_ms': frame_times[count // 2] / 1e6,
+            'p99_ms': frame_times[min(count - 1, int(count * 0.99))] / 1e6,
+            'phases_ms': {name: total / count / 1e6 for name, total in sorted(totals.items(), key=lambda item: -item[1])},
+        }
+
+    def draw_overlay(self, screen):
+        if not self.enabled:
+            return
+        summary = self.summary()
+        if summary is None:
+            return
+        if self._font is None:
+            self._font = pygame.font.SysFont('Arial', 14)
+        lines = [f"{summary['fps']:.0f} FPS  p50 {summary['p50_ms']:.1f} ms  p99 {summary['p99_ms']:.1f} ms"]
+        lines += [f"{name}: {ms:.2f} ms" for name, ms in summary['phases_ms'].items()]
+        surfaces = [self._font.render(line, True, OVERLAY_TEXT_COLOR) for line in lines]
+        width = max(surface.get_width() for surface in surfaces) + 10
+        height = sum(surface.get_height() for surface in surfaces) + 10
+        background = pygame.Surface((width, height), pygame.SRCALPHA)
+        background.fill(OVERLAY_COLOR)
+        screen.blit(background, (0, 0))
+        y = 5
+        for surface in surfaces:
+            screen.blit(surface, (5, y))
+            y += surface.get_height()
+
+    def dump(self):
+        """Write the Chrome trace-format JSON file; returns its path, or None when disabled."""
+        if not self.enabled:
+            return None
+        trace = [{'name': name, 'ph': 'X', 'ts': (start - self._origin) / 1000, 'dur': duration / 1000,
+                  'pid': os.getpid(), 'tid': 0 if name == 'frame' else 1}
+                 for name, start, duration in self.events]
+        with open(self.trace_path, 'w') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f)
+        return self.trace_path
+
+def profiler_from_env():
+    return FrameProfiler(enabled=os.environ.get('PUZZLE_PROFILE') == '1',
+                         trace_path=os.environ.get('PUZZLE_PROFILE_TRACE', 'frame_trace.json'))
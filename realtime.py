@@ -0,0 +1,105 @@
+from board import board_tables
+
+# Real-time search: instead of planning the whole solution before the first move, every call to
+# step() spends a fixed node budget on a depth-limited lookahead from the current board, commits the
+# best move found and returns it. The GUI calls it once per frame between clock ticks, so the first
+# move is ready after one slice on any board size and the frame time stays flat.
+#
+# This is LRTA* with a minimin lookahead: after each lookahead the current state's estimate is raised
+# to the best frontier value found, so the agent cannot loop forever and later visits look further.
+
+class _BudgetSpent(Exception):
+    pass
+
+class RealTimeSearch:
+    def __init__(self, board, node_budget=800, max_depth=20):
+        self.board = board.copy()
+        self.node_budget = node_budget
+        self.max_depth = max_depth
+        self.learned = {}  # zobrist key -> admissible lower bound on the distance to the goal
+        self.moves = []    # committed moves, in order
+        self.last_move = None
+        self.nodes = 0     # nodes generated over all slices
+        self.depth = 0     # lookahead depth completed in the last slice
+
+    def done(self):
+        return self.board.is_solved()
+
+    def step(self):
+        """Plan for one slice, commit a move and return it, or None once the board is solved."""
+        if self.board.is_solved():
+            return None
+        self._remaining = self.node_budget
+        best_move = None
+        depth = 1
+        while depth <= self.max_depth:
+            try:
+                move, value = self._lookahead(depth)
+            except _BudgetSpent:
+                break
+            best_move, best_value = move, value
+            self.depth = depth
+            if value <= depth:
+                break  # The goal is within the lookahead, so searching deeper cannot change the move
+            depth += 1
+        if best_move is None:
+            # Not even depth 1 fitted in the budget; a one-step lookahead is always affordable
+            self._remaining = float('inf')
+            best_move, best_value = self._lookahead(1)
+
+        if best_value > self._estimate():
+            self.learned[self.board.hash] = best_value
+        self.board.slide(self.board.blank + board_tables(self.board.n).offsets[best_move])
+        self.moves.append(best_move)
+        self.last_move = best_move
+        return best_move
+
+    def _estimate(self):
+        board = self.board
+        learned = self.learned.get(board.hash, 0)
+        return learned if learned > board.manhattan else board.manhattan
+
+    def _lookahead(self, depth):
+        # Minimin: the best f = g + h over the frontier at depth, with alpha pruning across children
+        board = self.board
+        offsets = board.tables.offsets
+        best_move, alpha = None, float('inf')
+
+        def search(g, remaining_depth, last_move, alpha):
+            h = self._estimate()
+            if h == 0 or remaining_depth == 0:
+                return g + h  # A goal ends the path, anything else is scored on its estimate
+            if g + h >= alpha:
+                return g + h
+            best = float('inf')
+            for move, tile, delta_h in board.successors(last_move):
+                self._remaining -= 1
+                if self._remaining < 0:
+                    raise _BudgetSpent
+                blank = board.blank
+                board.slide(blank + offsets[move])
+                try:
+                    value = search(g + 1, remaining_depth - 1, move, min(alpha, best))
+                finally:
+                    board.slide(blank)
+                self.nodes += 1
+                if value < best:
+                    best = value
+            # The estimate bounds the whole subtree, which is how learned values reach the lookahead
+            return best if best > g + h else g + h
+
+        # Backtracking into the previous state is allowed at the root: learned values may demand it
+        for move, tile, delta_h in board.successors():
+            self._remaining -= 1
+            if self._remaining < 0:
+                raise _BudgetSpent
+            blank = board.blank
+            board.slide(blank + offsets[move])
+            try:
+                value = search(1, depth - 1, move, alpha)
+            finally:
+                board.slide(blank)
+            self.nodes += 1
+            if value < alpha:
+                best_move, alpha = move, value
+        return best_move, alpha
@@ -0,0 +1,176 @@
+import argparse
+import os
+import queue
+import struct
+import threading
+
+from board import Board, DIRECTION_NAMES
+
+# Session recordings: the starting board followed by every move the blank makes, 2 bits per move.
+#
+# Layout (little endian): header (magic, n, keyframe interval, the n * n starting tiles), then
+# fixed-size chunks of one keyframe (the n * n tiles before the chunk's first move) and keyframe
+# interval moves packed 4 per byte, then a footer (end magic, move count) once the session is closed.
+# A chunk is only written when it is full, except the last one, which is zero padded before the
+# footer. Chunk k starts at a fixed offset, so any move is reached by reading one chunk and replaying
+# at most keyframe interval - 1 moves. A file cut short by a crash is still readable up to its last
+# full chunk.
+
+MAGIC = b'SPR1'
+END_MAGIC = b'SPRE'
+_HEADER = struct.Struct('<BI')
+_FOOTER = struct.Struct('<4sQ')
+MIN_KEYFRAME_INTERVAL = 64  # keeps a chunk longer than the footer, so the two cannot be confused
+
+def _pack_moves(moves, interval):
+    packed = bytearray(interval // 4)
+    for i, move in enumerate(moves):
+        packed[i >> 2] |= move << ((i & 3) * 2)
+    return packed
+
+class SessionRecorder:
+    """Records one game to path. record() only buffers; full chunks are written on a background thread."""
+
+    def __init__(self, path, board, keyframe_interval=256):
+        if keyframe_interval < MIN_KEYFRAME_INTERVAL or keyframe_interval % 4:
+            raise ValueError(f"keyframe_interval must be a multiple of 4 and at least {MIN_KEYFRAME_INTERVAL}")
+        if board.n * board.n > 256:
+            raise ValueError("boards with more than 256 squares cannot be recorded")
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.board = board.copy()
+        self.move_count = 0
+        self._keyframe = bytes(self.board.tiles)
+        self._moves = []
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._queue.put(MAGIC + _HEADER.pack(board.n, keyframe_interval) + self._keyframe)
+
+    def record(self, move):
+        """Record the blank moving in direction move (UP, DOWN, LEFT or RIGHT)."""
+        self.board.move(move)
+        self._moves.append(move)
+        self.move_count += 1
+        if len(self._moves) == self.keyframe_interval:
+            self._queue.put(self._keyframe + _pack_moves(self._moves, self.keyframe_interval))
+            self._keyframe = bytes(self.board.tiles)
+            self._moves = []
+
+    def record_state(self, state):
+        """Record the move that turns the recorded board into state; nothing if the blank has not moved."""
+        blank = [tile for row in state for tile in row].index(0)
+        if blank == self.board.blank:
+            return
+        for move, pos in self.board.legal_moves():
+            if pos == blank:
+                self.record(move)
+                return
+        raise ValueError("state is not one move away from the recorded board")
+
+    def close(self):
+        """Write the last chunk and the footer, and wait for the file to be complete."""
+        if self._moves:
+            self._queue.put(self._keyframe + _pack_moves(self._moves, self.keyframe_interval))
+        self._queue.put(_FOOTER.pack(END_MAGIC, self.move_count))
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        with open(self.path, 'ab') as f:
+            while True:
+                data = self._queue.get()
+                if data is None:
+                    return
+                f.write(data)
+                f.flush()
+
+class Replay:
+    """Reads a recording without loading it: the header and footer up front, chunks on demand."""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        if self.file.read(4) != MAGIC:
+            self.file.close()
+            raise ValueError("not a session recording")
+        self.n, self.keyframe_interval = _HEADER.unpack(self.file.read(_HEADER.size))
+        size = self.n * self.n
+        self.start = Board(self.n, self.file.read(size))
+        self.chunk_size = size + self.keyframe_interval // 4
+        self.data_offset = 4 + _HEADER.size + size
+
+        body = os.fstat(self.file.fileno()).st_size - self.data_offset
+        self.complete = False
+        if body % self.chunk_size == _FOOTER.size:
+            self.file.seek(-_FOOTER.size, os.SEEK_END)
+            end_magic, move_count = _FOOTER.unpack(self.file.read(_FOOTER.size))
+            if end_magic == END_MAGIC:
+                self.complete = True
+                self.move_count = move_count
+        if not self.complete:
+            # Unfinished recording: everything up to the last full chunk
+            self.move_count = body // self.chunk_size * self.keyframe_interval
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def _chunk(self, index):
+        # (keyframe board, moves in the chunk)
+        self.file.seek(self.data_offset + index * self.chunk_size)
+        data = self.file.read(self.chunk_size)
+        size = self.n * self.n
+        count = min(self.keyframe_interval, self.move_count - index * self.keyframe_interval)
+        moves = [(data[size + (i >> 2)] >> ((i & 3) * 2)) & 3 for i in range(count)]
+        return Board(self.n, data[:size]), moves
+
+    def board_at(self, move_index):
+        """The board after the first move_index moves."""
+        if not 0 <= move_index <= self.move_count:
+            raise IndexError(f"move {move_index} is outside 0..{self.move_count}")
+        if move_index == 0:
+            return self.start.copy()
+        index, offset = divmod(move_index, self.keyframe_interval)
+        if index * self.keyframe_interval == self.move_count:
+            index, offset = index - 1, self.keyframe_interval  # The end of the last full chunk
+        board, moves = self._chunk(index)
+        for move in moves[:offset]:
+            board.move(move)
+        return board
+
+    def moves(self, start=0):
+        """Yield the moves from move start onwards, reading one chunk at a time."""
+        index, offset = divmod(start, self.keyframe_interval)
+        while index * self.keyframe_interval < self.move_count:
+            yield from self._chunk(index)[1][offset:]
+            index, offset = index + 1, 0
+
+    def states(self, start=0):
+        """Yield the nested-list state after move start and after every move from there on."""
+        board = self.board_at(start)
+        yield board.to_state()
+        for move in self.moves(start):
+            board.move(move)
+            yield board.to_state()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect a sliding puzzle session recording.")
+    parser.add_argument('recording')
+    parser.add_argument('--at', type=int, metavar='MOVE', help="print the board after MOVE moves")
+    parser.add_argument('--moves', action='store_true', help="print every move")
+    args = parser.parse_args(argv)
+    with Replay(args.recording) as replay:
+        status = "complete" if replay.complete else "unfinished"
+        print(f"{replay.n}x{replay.n}, {replay.move_count} moves, {status}")
+        if args.at is not None:
+            print(' '.join(str(tile) for tile in replay.board_at(args.at).tiles))
+        if args.moves:
+            print(' '.join(DIRECTION_NAMES[move] for move in replay.moves()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import time
+
+from board import Board
+from checkpoint import CheckpointWriter, IDASnapshot, read_checkpoint
+
+# Search engines that work on a single Board in place: a move is made, searched below and undone,
+# so no child boards are allocated. Children come from Board.successors(), which drops the move
+# that undoes the previous one and puts the best Manhattan improvement first.
+
+def ida_star(board, max_depth=None, checkpoint=None, checkpoint_interval=60.0):
+    """Optimal solution by iterative-deepening A* on the Manhattan distance.
+
+    Returns (moves, expanded_nodes). moves is None if there is no solution within max_depth.
+    The board must be solvable when max_depth is None, otherwise the search never ends.
+    With checkpoint set to a file path, the search position is saved there every
+    checkpoint_interval seconds and resume_ida_star() can carry on from it after a crash.
+    """
+    board = board.copy()
+    snapshot = IDASnapshot(board.n, board.tiles, board.tables.goal.tolist(), board.manhattan, float('inf'), max_depth, 0, 0, 0, 0.0, [])
+    return _run_ida_star(board, snapshot, checkpoint, checkpoint_interval)
+
+def resume_ida_star(checkpoint, checkpoint_interval=60.0):
+    """Continue the ida_star() run saved in checkpoint; returns the same result an uninterrupted run would."""
+    snapshot = read_checkpoint(checkpoint)
+    return _run_ida_star(Board(snapshot.n, snapshot.tiles, snapshot.goal), snapshot, checkpoint, checkpoint_interval)
+
+def _run_ida_star(board, snapshot, checkpoint, checkpoint_interval):
+    writer = CheckpointWriter(checkpoint, checkpoint_interval) if checkpoint else None
+    try:
+        return _ida_star(board, snapshot, writer)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def _ida_star(board, snapshot, writer):
+    # Depth-first with an explicit stack of [children, next child index] so the position can be saved.
+    # Children are searched in the same order, and nodes counted the same way, as a recursive IDA*.
+    start_tiles = bytes(board.tiles)
+    goal = board.tables.goal.tolist()
+    offsets = board.tables.offsets
+    bound, next_bound, max_depth = snapshot.bound, snapshot.next_bound, snapshot.max_depth
+    iteration, expanded_nodes = snapshot.iteration, snapshot.expanded_nodes
+    started = time.monotonic() - snapshot.elapsed
+
+    # Replay the saved path to rebuild the stack; a fresh run starts with an empty one
+    path = []
+    stack = []
+    last_move = None
+    for move in snapshot.path:
+        children = board.successors(last_move)
+        stack.append([children, [child[0] for child in children].index(move) + 1])
+        board.slide(board.blank + offsets[move])
+        path.append(move)
+        last_move = move
+    if snapshot.path or snapshot.next_index:
+        stack.append([board.successors(last_move), snapshot.next_index])
+
+    while True:
+        if max_depth is not None and bound > max_depth:
+            return None, expanded_nodes
+        if not stack:
+            if board.manhattan == 0:
+                return path, expanded_nodes
+            expanded_nodes += 1
+            stack.append([board.successors(None), 0])
+
+        while stack:
+            entry = stack[-1]
+            children, index = entry
+            if index == len(children):
+                stack.pop()
+                if path:
+                    board.slide(board.blank - offsets[path.pop()])
+                continue
+            entry[1] = index + 1
+
+            move = children[index][0]
+            board.slide(board.blank + offsets[move])
+            path.append(move)
+            f = len(path) + board.manhattan
+            if f > bound:
+                if f < next_bound:
+                    next_bound = f
+                board.slide(board.blank - offsets[path.pop()])
+                continue
+            if board.manhattan == 0:
+                return path, expanded_nodes
+
+            expanded_nodes += 1
+            stack.append([board.successors(move), 0])
+            if writer is not None and expanded_nodes & 4095 == 0 and writer.due():
+                writer.submit(IDASnapshot(board.n, start_tiles, goal, bound, next_bound, max_depth, iteration, 0,
+                                          expanded_nodes, time.monotonic() - started, list(path)))
+
+        if next_bound == float('inf'):
+            return None, expanded_nodes
+        bound, next_bound = next_bound, float('inf')
+        iteration += 1
+
+def moves_to_states(state, moves):
+    # Expand a move list into the nested-list states the GUI animates, starting with state itself
+    board = Board.from_state(state)
+    states = [board.to_state()]
+    for move in moves:
+        board.move(move)
+        states.append(board.to_state())
+    return states
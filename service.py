@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from solver import check_puzzle, goalstate, is_solvable, Manhattan_heuristic
+from solver import solvePuzzle as solve_locally
+
+# Local solve service so the game, level-pack scripts and QA tools share one solver instead of each
+# calling solvePuzzle in-process. It speaks line-delimited JSON over a Unix or TCP socket:
+#
+#   {"id": 1, "op": "solve", "state": [[1, 2, 3], [4, 5, 6], [7, 0, 8]]}
+#   -> {"id": 1, "steps": 1, "frontierSize": 4, "solutions": [...], "cached": false}
+#   {"id": 2, "op": "metrics"}
+#   -> {"id": 2, "metrics": {...}}
+#
+# Identical boards that are already being solved share one computation, finished results are kept in
+# an LRU cache, and new work is gathered for a few milliseconds and sent to a process pool in batches.
+
+DEFAULT_ADDRESS = '127.0.0.1:8765'
+
+def _solve_batch(states):
+    # Runs in a pool worker process
+    return [solve_locally(len(state), state, Manhattan_heuristic) for state in states]
+
+def _state_key(state):
+    return tuple(tile for row in state for tile in row)
+
+class SolveService:
+    def __init__(self, workers=None, cache_size=4096, batch_window=0.002, max_batch=32):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.cache = OrderedDict()  # state key -> (steps, frontierSize, solutions), least recently used first
+        self.cache_size = cache_size
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.in_flight = {}  # state key -> future shared by every request for that board
+        self.queue = None    # boards waiting to be batched, created on the server's loop
+        self.latencies = []  # seconds, most recent requests only
+        self.counts = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'computed': 0, 'batches': 0, 'errors': 0}
+
+    async def solve(self, state):
+        key = _state_key(state)
+        result = self.cache.get(key)
+        if result is not None:
+            self.cache.move_to_end(key)
+            self.counts['cache_hits'] += 1
+            return result, True
+
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.counts['coalesced'] += 1
+        else:
+            future = self.in_flight[key] = asyncio.get_running_loop().create_future()
+            await self.queue.put((key, state))
+        return await future, False
+
+    async def batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.counts['batches'] += 1
+            # One slice per worker, so a batch keeps the whole pool busy instead of one process
+            size = -(-len(batch) // self.workers)
+            for start in range(0, len(batch), size):
+                loop.create_task(self._run_batch(batch[start:start + size]))
+
+    async def _run_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.pool, _solve_batch, [state for key, state in batch])
+        except Exception as error:
+            for key, state in batch:
+                self.in_flight.pop(key).set_exception(error)
+            return
+        for (key, state), result in zip(batch, results):
+            self.counts['computed'] += 1
+            self.cache[key] = result
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            self.in_flight.pop(key).set_result(result)
+
+    def metrics(self):
+        latencies = sorted(self.latencies)
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+        return dict(self.counts, queue_depth=self.queue.qsize(), in_flight=len(self.in_flight),
+                    cache_entries=len(self.cache), latency_p50_ms=percentile(0.5), latency_p99_ms=percentile(0.99))
+
+    async def handle(self, request):
+        if request.get('op') == 'metrics':
+            return {'metrics': self.metrics()}
+        if request.get('op') != 'solve':
+            raise ValueError(f"unknown op {request.get('op')!r}")
+
+        started = time.perf_counter()
+        self.counts['requests'] += 1
+        state = request.get('state')
+        check_puzzle(state)
+        if not is_solvable(state):
+            raise ValueError("puzzle is not solvable")
+        (steps, frontierSize, solutions), cached = await self.solve(state)
+        self.latencies.append(time.perf_counter() - started)
+        del self.latencies[:-10000]
+        return {'steps': steps, 'frontierSize': frontierSize, 'solutions': solutions, 'cached': cached}
+
+    async def serve_client(self, reader, writer):
+        # Requests on one connection are answered as they finish, so each reply echoes its "id"
+        async def answer(request):
+            try:
+                response = await self.handle(request)
+            except Exception as error:
+                self.counts['errors'] += 1
+                response = {'error': str(error)}
+            response['id'] = request.get('id')
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    writer.write(json.dumps({'id': None, 'error': 'invalid JSON'}).encode() + b'\n')
+                    continue
+                if not isinstance(request, dict):
+                    writer.write(json.dumps({'id': None, 'error': 'a request must be a JSON object'}).encode() + b'\n')
+                    continue
+                task = asyncio.create_task(answer(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, address=DEFAULT_ADDRESS):
+        self.queue = asyncio.Queue()
+        batcher = asyncio.create_task(self.batcher())
+        if address.startswith('unix:'):
+            server = await asyncio.start_unix_server(self.serve_client, path=address[5:])
+        else:
+            host, port = address.rsplit(':', 1)
+            server = await asyncio.start_server(self.serve_client, host, int(port))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self.pool.shutdown(cancel_futures=True)
+
+class SolveClient:
+    """Blocking client for the solve service; one connection, one request at a time."""
+
+    def __init__(self, address=DEFAULT_ADDRESS, timeout=None):
+        if address.startswith('unix:'):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(address[5:])
+        else:
+            host, port = address.rsplit(':', 1)
+            self.sock = socket.create_connection((host, int(port)), timeout=timeout)
+        self.file = self.sock.makefile('rwb')
+        self.next_id = 0
+
+    def request(self, request):
+        self.next_id += 1
+        request = dict(request, id=self.next_id)
+        self.file.write(json.dumps(request).encode() + b'\n')
+        self.file.flush()
+        response = json.loads(self.file.readline())
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response
+
+    def solvePuzzle(self, n, state, heuristic=Manhattan_heuristic, goal=None, stats=None):
+        # Same arguments and result as solver.solvePuzzle; the service always uses the Manhattan
+        # heuristic and the standard goal, and does not collect closed-set stats
+        if heuristic is not Manhattan_heuristic:
+            raise ValueError("the solve service only supports Manhattan_heuristic")
+        if goal is not None and goal != goalstate(state):
+            raise ValueError("the solve service only solves towards the standard goal")
+        if stats is not None:
+            raise ValueError("the solve service does not report search stats")
+        response = self.request({'op': 'solve', 'state': state})
+        return response['steps'], response['frontierSize'], response['solutions']
+
+    def metrics(self):
+        return self.request({'op': 'metrics'})['metrics']
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+_clients = {}
+
+def solvePuzzle(n, state, heuristic=Manhattan_heuristic, goal=None, stats=None, *, address=DEFAULT_ADDRESS):
+    """Drop-in replacement for solver.solvePuzzle that asks the service at address, reusing one connection."""
+    client = _clients.get(address)
+    if client is None:
+        client = _clients[address] = SolveClient(address)
+    return client.solvePuzzle(n, state, heuristic, goal, stats)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve sliding puzzle solves over line-delimited JSON.")
+    parser.add_argument('--address', default=DEFAULT_ADDRESS, help=f"host:port or unix:/path (default: {DEFAULT_ADDRESS})")
+    parser.add_argument('--workers', type=int, help="solver processes (default: one per CPU)")
+    parser.add_argument('--cache-size', type=int, default=4096, help="results kept in the LRU cache (default: 4096)")
+    args = parser.parse_args(argv)
+    service = SolveService(workers=args.workers, cache_size=args.cache_size)
+    try:
+        asyncio.run(service.serve(args.address))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+import heapq
+import sys
+from itertools import count
+
+from board import INVERSE
+
+# SMA*: best-first search that never holds more than max_nodes search nodes in its tree. Pruned nodes
+# are freed when the lazily deleted heaps are compacted, which happens before they reach max_nodes / 4.
+#
+# When the cap is reached the worst leaf (highest f, shallowest) is dropped and its f-value is
+# remembered by its parent as a "forgotten" successor. The parent's f is the backed-up minimum over
+# its children and forgotten successors, so the search knows when the dropped branch has become the
+# most promising again and regenerates it from the parent. With an admissible heuristic the result is
+# optimal whenever the cap can hold the solution path; otherwise no solution is returned.
+
+INFINITY = float('inf')
+HEAP_SLACK = 2     # each heap is rebuilt once it holds this many entries per allowed node
+DEAD_FRACTION = 4  # ... or once max_nodes / DEAD_FRACTION pruned nodes are still held by stale entries
+
+class _Node:
+    __slots__ = ('tiles', 'blank', 'g', 'h', 'f', 'parent', 'move', 'pending', 'children', 'forgotten',
+                 'alive', 'queued')
+
+    def key(self):
+        # f of the next successor this node would generate; goals are "expanded" into the answer
+        if self.h == 0 or self.pending:
+            return self.f
+        if self.forgotten:
+            return min(self.forgotten.values())
+        return None
+
+def _successor_moves(tables, tiles, blank, last_move):
+    # Same order as Board.successors(): best Manhattan improvement first, the undoing move skipped
+    size = tables.size
+    distance = tables.distance
+    skip = INVERSE[last_move] if last_move is not None else None
+    children = []
+    for direction, pos in tables.neighbours[blank]:
+        if direction != skip:
+            tile = tiles[pos]
+            children.append((distance[tile * size + blank] - distance[tile * size + pos], direction))
+    children.sort()
+    return [direction for delta_h, direction in children]
+
+def node_bytes(n):
+    """Approximate memory held by one search node on an n x n board, used to turn max_bytes into a node cap."""
+    node = _Node()
+    node.tiles = bytes(n * n)
+    node.pending = [0, 1, 2]
+    node.children = {}
+    node.forgotten = {}
+    entry = sys.getsizeof((0, 0, 0, node)) + 8  # a heap entry and its list slot
+    size = (sys.getsizeof(node) + sys.getsizeof(node.tiles) + sys.getsizeof(node.pending)
+            + sys.getsizeof(node.children) + sys.getsizeof(node.forgotten))
+    # Pruned nodes linger until the next compaction, and each heap holds up to HEAP_SLACK entries per node
+    return size + size // DEAD_FRACTION + HEAP_SLACK * 2 * entry
+
+def sma_star(board, max_nodes=100000, max_bytes=None):
+    """Optimal solve that keeps at most max_nodes nodes in memory (or about max_bytes, if given).
+
+    Returns (moves, stats). moves is None if no solution fits within the cap. stats counts
+    'expanded', 'generated', 'pruned' and 'regenerated' nodes and records 'peak_nodes' and the
+    effective 'max_nodes'; 'regenerated' > 0 means the cap forced parts of the tree to be searched again.
+    'peak_retained' counts pruned nodes not yet freed as well, and 'peak_heap_entries' is the most
+    entries the two priority queues held at once.
+    """
+    n = board.n
+    tables = board.tables
+    distance = tables.distance
+    size = tables.size
+    if max_bytes is not None:
+        max_nodes = min(max_nodes, max_bytes // node_bytes(n))
+    max_nodes = max(max_nodes, 2)
+    stats = {'expanded': 0, 'generated': 1, 'pruned': 0, 'regenerated': 0, 'peak_nodes': 1, 'max_nodes': max_nodes,
+             'peak_retained': 1, 'peak_heap_entries': 1}
+
+    seq = count()
+    open_heap = []  # (key, -depth, seq, node): lowest key first, deepest on ties
+    leaf_heap = []  # (-f, depth, seq, node): highest f first, shallowest on ties
+
+    def push_open(node):
+        key = node.key()
+        if key is not None and key != node.queued:
+            node.queued = key
+            heapq.heappush(open_heap, (key, -node.g, next(seq), node))
+
+    def push_leaf(node):
+        heapq.heappush(leaf_heap, (-node.f, node.g, next(seq), node))
+
+    def compact():
+        # Both heaps delete lazily; drop the stale entries so pruned nodes are freed and memory stays bounded
+        nonlocal dead
+        dead = 0
+        live_open = [entry for entry in open_heap if entry[3].alive and entry[0] == entry[3].queued]
+        live_leaves = {}
+        for entry in leaf_heap:
+            leaf = entry[3]
+            if leaf.alive and not leaf.children and leaf.parent is not None and -entry[0] == leaf.f:
+                live_leaves[id(leaf)] = entry
+        open_heap[:] = live_open
+        leaf_heap[:] = live_leaves.values()
+        heapq.heapify(open_heap)
+        heapq.heapify(leaf_heap)
+
+    def make_node(tiles, blank, g, h, f, parent, move):
+        node = _Node()
+        node.tiles, node.blank, node.g, node.h, node.f = tiles, blank, g, h, f
+        node.parent, node.move = parent, move
+        node.pending = _successor_moves(tables, tiles, blank, move) if h else []
+        node.children = {}
+        node.forgotten = {}
+        node.alive = True
+        node.queued = None
+        return node
+
+    def backup(node):
+        # Raise f to the best of the successors once all of them have been generated, up to the root
+        while node is not None and not node.pending:
+            values = [child.f for child in node.children.values()]
+            values.extend(node.forgotten.values())
+            best = min(values) if values else INFINITY
+            if best <= node.f:
+                return
+            node.f = best
+            push_open(node)
+            if not node.children and node.parent is not None:
+                push_leaf(node)  # Its old leaf entry is stale now that f has changed
+            node = node.parent
+
+    def prune(keep):
+        # Drop the worst leaf other than keep, remembering its f in the parent; False if there was none
+        skipped = []
+        pruned = False
+        while leaf_heap:
+            entry = heapq.heappop(leaf_heap)
+            leaf = entry[3]
+            if not leaf.alive or leaf.children or leaf.parent is None or -entry[0] != leaf.f:
+                continue
+            if leaf is keep:
+                skipped.append(entry)
+                continue
+            leaf.alive = False
+            parent = leaf.parent
+            del parent.children[leaf.move]
+            parent.forgotten[leaf.move] = min(parent.forgotten.get(leaf.move, INFINITY), leaf.f)
+            if not parent.children:
+                push_leaf(parent)
+            push_open(parent)
+            stats['pruned'] += 1
+            pruned = True
+            break
+        for entry in skipped:
+            heapq.heappush(leaf_heap, entry)
+        return pruned
+
+    start = board.copy()
+    root = make_node(bytes(start.tiles), start.blank, 0, start.manhattan, start.manhattan, None, None)
+    push_open(root)
+    stored = 1
+    dead = 0  # pruned nodes still referenced from stale heap entries
+
+    while open_heap:
+        key, depth, _, node = heapq.heappop(open_heap)
+        if not node.alive or key != node.queued:
+            continue
+        node.queued = None
+        if key == INFINITY:
+            break
+        if node.h == 0:
+            moves = []
+            while node.parent is not None:
+                moves.append(node.move)
+                node = node.parent
+            moves.reverse()
+            return moves, stats
+
+        # Generate one successor: a new one first, otherwise the most promising forgotten one
+        if node.pending:
+            move = node.pending.pop(0)
+            floor = node.f
+        else:
+            move = min(node.forgotten, key=node.forgotten.get)
+            floor = node.forgotten.pop(move)
+            stats['regenerated'] += 1
+        pos = node.blank + tables.offsets[move]
+        tile = node.tiles[pos]
+        tiles = bytearray(node.tiles)
+        tiles[node.blank], tiles[pos] = tile, 0
+        h = node.h + distance[tile * size + node.blank] - distance[tile * size + pos]
+        g = node.g + 1
+        f = max(floor, g + h)
+        if h and g >= max_nodes - 1:
+            f = INFINITY  # The path to any goal below here could not fit in memory
+        child = make_node(bytes(tiles), pos, g, h, f, node, move)
+        node.children[move] = child
+        stats['expanded'] += 1
+        stats['generated'] += 1
+
+        push_open(child)
+        push_leaf(child)
+        push_open(node)
+        backup(node)
+
+        stored += 1
+        if stored > max_nodes and prune(child):
+            stored -= 1
+            dead += 1
+        stats['peak_nodes'] = max(stats['peak_nodes'], stored)
+        stats['peak_retained'] = max(stats['peak_retained'], stored + dead)
+        if (dead * DEAD_FRACTION >= max_nodes or len(open_heap) > HEAP_SLACK * max_nodes
+                or len(leaf_heap) > HEAP_SLACK * max_nodes):
+            compact()
+        stats['peak_heap_entries'] = max(stats['peak_heap_entries'], len(open_heap) + len(leaf_heap))
+
+    return None, stats
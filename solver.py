@@ -0,0 +1,178 @@
+import random
+
+from board import board_tables
+from packed import pack_state, PackedStateSet, slide_packed
+
+# Solver core shared by the GUI scripts and the headless CLI.
+# Nothing in here may import pygame, so it stays cheap to import from scripts and tests.
+
+def _flatten(state):
+    return [tile for row in state for tile in row]
+
+def check_puzzle(puzzle):
+    """Raise ValueError unless puzzle is n x n rows (n >= 2) holding each of 0 .. n*n - 1 once."""
+    n = len(puzzle) if isinstance(puzzle, list) else 0
+    if n < 2 or not all(isinstance(row, list) and len(row) == n for row in puzzle):
+        raise ValueError("a puzzle must be a square list of at least 2 rows")
+    tiles = _flatten(puzzle)
+    if not all(type(tile) is int for tile in tiles) or sorted(tiles) != list(range(n * n)):
+        raise ValueError(f"a {n}x{n} puzzle must hold each of 0..{n * n - 1} exactly once")
+
+def is_solvable(puzzle, goal=None):
+    # Every move swaps the blank with a neighbour: one transposition, and one step for the blank.
+    # So puzzle can reach goal exactly when the permutation between them has the parity of the
+    # blank's distance from its goal square. goal is nested rows like puzzle; None means the standard goal.
+    n = len(puzzle)
+    tiles = _flatten(puzzle)
+    goal_position = board_tables(n, None if goal is None else _flatten(goal)).goal_position
+    seen = [False] * len(tiles)
+    transpositions = 0
+    for start in range(len(tiles)):
+        if seen[start]:
+            continue
+        pos = start
+        while not seen[pos]:
+            seen[pos] = True
+            pos = goal_position[tiles[pos]]
+            transpositions += 1
+        transpositions -= 1  # A cycle of k squares is k - 1 transpositions
+    blank, blank_goal = tiles.index(0), goal_position[0]
+    blank_distance = abs(blank // n - blank_goal // n) + abs(blank % n - blank_goal % n)
+    return transpositions % 2 == blank_distance % 2
+
+def generate_random_puzzle(n, goal=None):
+    puzzle = list(range(n * n))
+    while True:
+        random.shuffle(puzzle)
+        puzzle_2d = [puzzle[i:i + n] for i in range(0, len(puzzle), n)]
+
+        # Ensure that 0 is at the last position
+        if puzzle_2d[-1][-1] != 0:
+            zero_pos = puzzle.index(0)
+            puzzle[zero_pos], puzzle[-1] = puzzle[-1], puzzle[zero_pos]
+            puzzle_2d = [puzzle[i:i + n] for i in range(0, len(puzzle), n)]
+
+        if is_solvable(puzzle_2d, goal):
+            return puzzle_2d
+
+def goalstate(state):
+    n = len(state)
+    flat_goallist = list(range(1, n ** 2)) + [0]  # Ensure 0 is last
+    goal = [flat_goallist[i:i + n] for i in range(0, n ** 2, n)]
+    return goal
+
+def moves(inputs, n):
+    storage = []
+    i = next(index for index, row in enumerate(inputs) if 0 in row)
+    j = inputs[i].index(0)
+
+    # Each child is copied from the input once; the input itself is never modified
+    if i > 0:  # Move up
+        move = [row[:] for row in inputs]
+        move[i][j], move[i - 1][j] = move[i - 1][j], move[i][j]
+        storage.append(move)
+
+    if i < n - 1:  # Move down
+        move = [row[:] for row in inputs]
+        move[i][j], move[i + 1][j] = move[i + 1][j], move[i][j]
+        storage.append(move)
+
+    if j > 0:  # Move left
+        move = [row[:] for row in inputs]
+        move[i][j], move[i][j - 1] = move[i][j - 1], move[i][j]
+        storage.append(move)
+
+    if j < n - 1:  # Move right
+        move = [row[:] for row in inputs]
+        move[i][j], move[i][j + 1] = move[i][j + 1], move[i][j]
+        storage.append(move)
+
+    return storage
+
+def Manhattan_heuristic(state):
+    flat_statelist = [item for sublist in state for item in sublist]
+    mandistance = 0
+    for index, element in enumerate(flat_statelist):
+        if element == 0:
+            continue  # Ignore the empty tile
+        goal_x, goal_y = divmod(element - 1, len(state[0]))  # Adjusted for 0 indexing
+        curr_x, curr_y = divmod(index, len(state[0]))
+        mandistance += abs(goal_x - curr_x) + abs(goal_y - curr_y)
+    return mandistance
+
+_heuristics = {}
+
+def manhattan_to(goal):
+    """Manhattan heuristic towards goal (nested rows), read from the goal's precomputed distance table."""
+    n = len(goal)
+    flat_goal = tuple(_flatten(goal))
+    heuristic = _heuristics.get(flat_goal)
+    if heuristic is None:
+        tables = board_tables(n, flat_goal)
+        distance, size = tables.distance, tables.size
+
+        def heuristic(state):
+            mandistance = 0
+            pos = 0
+            for row in state:
+                for tile in row:
+                    mandistance += distance[tile * size + pos]  # Always 0 for the blank
+                    pos += 1
+            return mandistance
+
+        _heuristics[flat_goal] = heuristic
+    return heuristic
+
+def Astar(start, finish, heuristic, stats=None):
+    # When stats is a dict it receives the closed set's size and memory use
+    n = len(start)
+    if heuristic is Manhattan_heuristic:
+        heuristic = manhattan_to(finish)  # Same values for the standard goal, and correct for any other
+    neighbours = board_tables(n).neighbours
+    # Frontier entries are [packed state, path]; a child's packed state is derived from its parent's in O(1)
+    pathstorage = [[pack_state(start), [heuristic(start), start]]]
+    expanded = PackedStateSet(n)
+    expanded_nodes = 0
+
+    while pathstorage:
+        i = 0
+        for j in range(1, len(pathstorage)):
+            if pathstorage[i][1][0] > pathstorage[j][1][0]:
+                i = j
+        key, path = pathstorage.pop(i)
+        current_node = path[-1]
+
+        if current_node == finish:
+            _closed_set_stats(expanded, stats)
+            return expanded_nodes, len(path), path
+
+        if not expanded.add(key):
+            continue  # Already expanded
+
+        blank_i = next(index for index, row in enumerate(current_node) if 0 in row)
+        blank_j = current_node[blank_i].index(0)
+        blank = blank_i * n + blank_j
+        # moves() generates children in the same order as the neighbour table
+        for next_move, (direction, target) in zip(moves(current_node, n), neighbours[blank]):
+            next_key = slide_packed(key, n, next_move[blank_i][blank_j], target, blank)
+            if next_key in expanded:
+                continue
+            newpath = [path[0] + heuristic(next_move) - heuristic(current_node)] + path[1:] + [next_move]
+            pathstorage.append([next_key, newpath])
+
+        expanded_nodes += 1
+
+    _closed_set_stats(expanded, stats)
+    return expanded_nodes, 0, []
+
+def _closed_set_stats(expanded, stats):
+    if stats is not None:
+        stats['closed_states'] = len(expanded)
+        stats['closed_bytes'] = expanded.memory_bytes()
+        stats['closed_bytes_per_state'] = expanded.bytes_per_state()
+
+def solvePuzzle(n, state, heuristic, goal=None, stats=None):
+    if goal is None:
+        goal = goalstate(state)
+    steps, frontierSize, solutions = Astar(state, goal, heuristic, stats)
+    return steps, frontierSize, solutions
@@ -1,5 +1,8 @@
 import pygame
-import random
+
+from board import Board
+from optimizer import optimize_path
+from solver import generate_random_puzzle, goalstate, Manhattan_heuristic, solvePuzzle
 
 # Constants for the visual interface
 WINDOW_SIZE = 500
@@ -14,11 +17,18 @@ TURN_COUNT_HEIGHT = 75  # Height allocated for the turn count display
 BUTTON_WIDTH = 150
 BUTTON_HEIGHT = 50
 
-# Initialize Pygame
-pygame.init()
-font = pygame.font.SysFont('Arial', FONT_SIZE)
-button_font = pygame.font.SysFont('Arial', BUTTON_FONT_SIZE)
-clock = pygame.time.Clock()
+# Pygame is initialized lazily by init_pygame() so importing this module stays cheap
+font = None
+button_font = None
+clock = None
+
+def init_pygame():
+    global font, button_font, clock
+    if clock is None:
+        pygame.init()
+        font = pygame.font.SysFont('Arial', FONT_SIZE)
+        button_font = pygame.font.SysFont('Arial', BUTTON_FONT_SIZE)
+        clock = pygame.time.Clock()
 
 class PuzzleNode:
     def __init__(self, n, state):
@@ -50,112 +60,6 @@ class PuzzleNode:
                 if self.state[i][j] == 0:
                     return (i, j)
 
-def is_solvable(puzzle):
-    flat_puzzle = [tile for row in puzzle for tile in row if tile != 0]
-    inversions = 0
-    for i in range(len(flat_puzzle)):
-        for j in range(i + 1, len(flat_puzzle)):
-            if flat_puzzle[i] > flat_puzzle[j]:
-                inversions += 1
-    return inversions % 2 == 0
-
-def generate_random_puzzle(n):
-    puzzle = list(range(n * n))
-    while True:
-        random.shuffle(puzzle)
-        puzzle_2d = [puzzle[i:i + n] for i in range(0, len(puzzle), n)]
-        
-        # Ensure that 0 is at the last position
-        if puzzle_2d[-1][-1] != 0:
-            zero_pos = puzzle.index(0)
-            puzzle[zero_pos], puzzle[-1] = puzzle[-1], puzzle[zero_pos]
-            puzzle_2d = [puzzle[i:i + n] for i in range(0, len(puzzle), n)]
-        
-        if is_solvable(puzzle_2d):
-            return puzzle_2d
-
-def goalstate(state):
-    n = len(state)
-    flat_goallist = list(range(1, n ** 2)) + [0]  # Ensure 0 is last
-    goal = [flat_goallist[i:i + n] for i in range(0, n ** 2, n)]
-    return goal
-
-def moves(inputs, n):
-    storage = []
-    move = [row[:] for row in inputs]  # Deep copy of the current state
-    i = next(index for index, row in enumerate(move) if 0 in row)
-    j = move[i].index(0)
-
-    if i > 0:  # Move up
-        move[i][j], move[i - 1][j] = move[i - 1][j], move[i][j]
-        storage.append([row[:] for row in move])
-        move[i][j], move[i - 1][j] = move[i - 1][j], move[i][j]
-
-    if i < n - 1:  # Move down
-        move[i][j], move[i + 1][j] = move[i + 1][j], move[i][j]
-        storage.append([row[:] for row in move])
-        move[i][j], move[i + 1][j] = move[i + 1][j], move[i][j]
-
-    if j > 0:  # Move left
-        move[i][j], move[i][j - 1] = move[i][j - 1], move[i][j]
-        storage.append([row[:] for row in move])
-        move[i][j], move[i][j - 1] = move[i][j - 1], move[i][j]
-
-    if j < n - 1:  # Move right
-        move[i][j], move[i][j + 1] = move[i][j + 1], move[i][j]
-        storage.append([row[:] for row in move])
-        move[i][j], move[i][j + 1] = move[i][j + 1], move[i][j]
-
-    return storage
-
-def Manhattan_heuristic(state):
-    flat_statelist = [item for sublist in state for item in sublist]
-    mandistance = 0
-    for index, element in enumerate(flat_statelist):
-        if element == 0:
-            continue  # Ignore the empty tile
-        goal_x, goal_y = divmod(element - 1, len(state[0]))  # Adjusted for 0 indexing
-        curr_x, curr_y = divmod(index, len(state[0]))
-        mandistance += abs(goal_x - curr_x) + abs(goal_y - curr_y)
-    return mandistance
-
-def Astar(start, finish, heuristic):
-    n = len(start)
-    pathstorage = [[heuristic(start), start]]
-    expanded = []
-    expanded_nodes = 0
-
-    while pathstorage:
-        i = 0
-        for j in range(1, len(pathstorage)):
-            if pathstorage[i][0] > pathstorage[j][0]:
-                i = j
-        path = pathstorage.pop(i)
-        current_node = path[-1]
-
-        if current_node == finish:
-            return expanded_nodes, len(path), path
-
-        if current_node in expanded:
-            continue
-
-        expanded.append(current_node)
-
-        for next_move in moves(current_node, n):
-            if next_move in expanded:
-                continue
-            newpath = [path[0] + heuristic(next_move) - heuristic(current_node)] + path[1:] + [next_move]
-            pathstorage.append(newpath)
-
-        expanded_nodes += 1
-
-    return expanded_nodes, 0, []
-
-def solvePuzzle(n, state, heuristic):
-    goal = goalstate(state)
-    steps, frontierSize, solutions = Astar(state, goal, heuristic)
-    return steps, frontierSize, solutions
-
 def initialize_tile_positions(n, state):
     # Initializes the position of the tiles based on their grid location
     tile_size = (WINDOW_SIZE) // n
@@ -174,15 +78,17 @@ def draw_button(screen, text, x, y, width, height, color, font, text_color=(0, 0
     screen.blit(text_surface, text_rect)
 
 def main():
+    init_pygame()
     n = 3
     random_puzzle = generate_random_puzzle(n)
+    board = Board.from_state(random_puzzle)
     solved_puzzle = goalstate(random_puzzle)
 
     screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE + TURN_COUNT_HEIGHT))
     pygame.display.set_caption("Sliding Puzzle Game")
 
     steps, frontierSize, solutions = solvePuzzle(n, random_puzzle, Manhattan_heuristic)
-    solution_steps = solutions[1:]
+    solution_steps = optimize_path(solutions[1:])
 
     tile_positions = initialize_tile_positions(n, random_puzzle)
 
@@ -226,9 +132,10 @@ def main():
                     pygame.time.delay(100)  # Delay for animation effect
 
                     random_puzzle = generate_random_puzzle(n)
+                    board = Board.from_state(random_puzzle)
                     tile_positions = initialize_tile_positions(n, random_puzzle)
                     steps, frontierSize, solutions = solvePuzzle(n, random_puzzle, Manhattan_heuristic)
-                    solution_steps = solutions[1:]
+                    solution_steps = optimize_path(solutions[1:])
                     step_idx = 0
                     turn_count = 0
                     manual_mode = True  # Enable manual mode again
@@ -248,16 +155,14 @@ def main():
                     clicked_tile_x = x // tile_size
                     clicked_tile_y = y // tile_size
 
-                    # Get the clicked tile value
                     if clicked_tile_x < n and clicked_tile_y < n:
-                        clicked_tile_value = random_puzzle[clicked_tile_y][clicked_tile_x]
-                        empty_pos = puzzle_node.get_empty_position()
-                        empty_i, empty_j = empty_pos
+                        clicked_pos = clicked_tile_y * n + clicked_tile_x
 
                         # Check if clicked tile can move
-                        if (clicked_tile_y == empty_i and abs(clicked_tile_x - empty_j) == 1) or (clicked_tile_x == empty_j and abs(clicked_tile_y - empty_i) == 1):
+                        if board.can_slide(clicked_pos):
                             # Move the clicked tile into the empty space
-                            random_puzzle[empty_i][empty_j], random_puzzle[clicked_tile_y][clicked_tile_x] = random_puzzle[clicked_tile_y][clicked_tile_x], random_puzzle[empty_i][empty_j]
+                            board.slide(clicked_pos)
+                            random_puzzle = board.to_state()
                             tile_positions = initialize_tile_positions(n, random_puzzle)  # Update tile positions
                             turn_count += 1  # Increment turn count
 
@@ -265,6 +170,7 @@ def main():
         if not manual_mode and animating:
             if step_idx < len(solution_steps):
                 random_puzzle = solution_steps[step_idx]
+                board = Board.from_state(random_puzzle)
                 tile_positions = initialize_tile_positions(n, random_puzzle)  # Update tile positions
                 step_idx += 1
             else:
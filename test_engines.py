@@ -0,0 +1,189 @@
+import itertools
+import random
+import threading
+from collections import deque
+
+import pytest
+
+import search
+import smastar
+from board import Board, board_tables, standard_goal
+from checkpoint import pack_snapshot, read_checkpoint, write_atomic
+from hint import HintEngine
+from search import ida_star, resume_ida_star
+from smastar import sma_star
+from solver import is_solvable
+
+# Regression checks for the optimal engines, IDA* checkpoints and goal-aware solvability.
+# Run with: python -m pytest -q test_engines.py
+
+HARD_3X3 = [8, 6, 7, 2, 5, 4, 3, 0, 1]  # 31 moves, the longest 3x3 solution
+SNAKE_GOAL = [1, 2, 3, 6, 5, 4, 7, 8, 0]
+
+def bfs_distances(n, goal):
+    # Distance to goal for every reachable state, keyed on the tile bytes
+    start = Board(n, goal)
+    distances = {bytes(start.tiles): 0}
+    queue = deque([start])
+    while queue:
+        board = queue.popleft()
+        depth = distances[bytes(board.tiles)] + 1
+        for move, pos in board.legal_moves():
+            child = board.copy()
+            child.slide(pos)
+            key = bytes(child.tiles)
+            if key not in distances:
+                distances[key] = depth
+                queue.append(child)
+    return distances
+
+@pytest.fixture(scope='module')
+def distances_3x3():
+    return bfs_distances(3, standard_goal(3))
+
+def random_solvable(distances, count, seed):
+    states = sorted(distances)
+    return random.Random(seed).sample(states, count)
+
+def apply_moves(board, moves):
+    board = board.copy()
+    for move in moves:
+        board.move(move)
+    return board
+
+def relabel(tiles, goal):
+    # The same puzzle with its tiles renamed so that it is solved at goal instead of the standard goal
+    position = board_tables(3).goal_position
+    return [goal[position[tile]] for tile in tiles]
+
+def test_ida_star_is_optimal(distances_3x3):
+    for tiles in random_solvable(distances_3x3, 20, seed=1) + [bytes(HARD_3X3)]:
+        board = Board(3, tiles)
+        moves, expanded = ida_star(board)
+        assert len(moves) == distances_3x3[bytes(tiles)]
+        assert apply_moves(board, moves).is_solved()
+
+@pytest.mark.parametrize('max_nodes', [100000, 200])
+def test_sma_star_is_optimal(distances_3x3, max_nodes):
+    for tiles in random_solvable(distances_3x3, 10, seed=2):
+        board = Board(3, tiles)
+        moves, stats = sma_star(board, max_nodes)
+        assert len(moves) == distances_3x3[bytes(tiles)]
+        assert apply_moves(board, moves).is_solved()
+        assert stats['peak_nodes'] <= max_nodes
+
+def test_sma_star_retains_a_bounded_number_of_nodes(monkeypatch):
+    live = {'now': 0, 'peak': 0}
+
+    class CountedNode(smastar._Node):
+        __slots__ = ()
+
+        def __init__(self):
+            live['now'] += 1
+            live['peak'] = max(live['peak'], live['now'])
+
+        def __del__(self):
+            live['now'] -= 1
+
+    monkeypatch.setattr(smastar, '_Node', CountedNode)
+    max_nodes = 50
+    moves, stats = sma_star(Board(3, HARD_3X3), max_nodes)
+    assert len(moves) == 31
+    assert stats['pruned'] > 0
+    assert stats['peak_nodes'] <= max_nodes
+    assert live['peak'] <= stats['peak_retained'] <= max_nodes + max_nodes // smastar.DEAD_FRACTION + 1
+    assert stats['peak_heap_entries'] <= 2 * smastar.HEAP_SLACK * max_nodes + 2
+
+def snapshots_of(board, monkeypatch):
+    # Every snapshot an ida_star() run would hand to its checkpoint writer
+    snapshots = []
+
+    class Recorder:
+        def __init__(self, path, interval):
+            pass
+
+        def due(self):
+            return True
+
+        def submit(self, snapshot):
+            snapshots.append(snapshot)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(search, 'CheckpointWriter', Recorder)
+    result = ida_star(board, max_depth=31, checkpoint='unused')
+    monkeypatch.undo()
+    return result, snapshots
+
+@pytest.mark.parametrize('goal', [None, SNAKE_GOAL])
+def test_resume_matches_an_uninterrupted_run(goal, tmp_path, monkeypatch):
+    tiles = HARD_3X3 if goal is None else relabel(HARD_3X3, goal)
+    board = Board(3, tiles, goal)
+    expected = ida_star(board, max_depth=31)  # The depth cap makes a resume towards the wrong goal fail fast
+    result, snapshots = snapshots_of(board, monkeypatch)
+    assert result == expected
+    assert snapshots
+
+    path = tmp_path / 'ida.ckpt'
+    for snapshot in snapshots[::max(1, len(snapshots) // 4)]:
+        write_atomic(path, pack_snapshot(snapshot))
+        assert list(read_checkpoint(path).goal) == list(board.tables.goal)
+        assert resume_ida_star(path) == expected
+
+def test_custom_goal_search_matches_the_relabelled_standard_search():
+    moves, expanded = ida_star(Board(3, HARD_3X3))
+    assert ida_star(Board(3, relabel(HARD_3X3, SNAKE_GOAL), SNAKE_GOAL)) == (moves, expanded)
+
+def test_is_solvable_matches_reachability_on_2x2():
+    for goal in itertools.permutations(range(4)):
+        reachable = bfs_distances(2, goal)
+        goal_rows = [list(goal[:2]), list(goal[2:])]
+        for tiles in itertools.permutations(range(4)):
+            puzzle = [list(tiles[:2]), list(tiles[2:])]
+            assert is_solvable(puzzle, goal_rows) == (bytes(tiles) in reachable)
+
+def test_is_solvable_matches_reachability_on_3x3(distances_3x3):
+    rng = random.Random(3)
+    for _ in range(500):
+        tiles = list(range(9))
+        rng.shuffle(tiles)
+        puzzle = [tiles[i:i + 3] for i in range(0, 9, 3)]
+        assert is_solvable(puzzle) == (bytes(tiles) in distances_3x3)
+
+def test_checkpoint_writer_saves_resumable_checkpoints(tmp_path):
+    path = tmp_path / 'ida.ckpt'
+    board = Board(3, HARD_3X3)
+    expected = ida_star(board)
+    assert ida_star(board, checkpoint=path, checkpoint_interval=0) == expected
+    assert resume_ida_star(path) == expected
+
+def test_checkpoint_write_errors_are_raised_not_hung(tmp_path):
+    outcome = {}
+
+    def run():
+        try:
+            outcome['result'] = ida_star(Board(3, HARD_3X3), checkpoint=tmp_path / 'missing' / 'ida.ckpt',
+                                         checkpoint_interval=0)
+        except OSError as error:
+            outcome['error'] = error
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(30)
+    assert not thread.is_alive(), "ida_star() hung after a failed checkpoint write"
+    assert isinstance(outcome.get('error'), FileNotFoundError)
+
+@pytest.mark.parametrize('seed', [2, 3, 4])
+def test_hints_reach_the_goal_when_every_search_runs_out_of_time(seed):
+    board = Board(4, standard_goal(4))
+    rng = random.Random(seed)
+    for _ in range(1000):
+        board.slide(rng.choice(board.legal_moves())[1])
+    hints = HintEngine(budget=0)  # IDA* never finishes, so every move comes from the lookahead
+    for _ in range(600):  # The old one-step backup needed 1200 to 1800 hints on these boards
+        hint = hints.hint(board)
+        if hint is None:
+            break
+        board.move(hint[0])
+    assert board.is_solved()
@@ -0,0 +1,28 @@
+import random
+from array import array
+
+# Zobrist hashing: every (tile, position) pair gets a random 64-bit key and a board hashes to the
+# XOR of the keys of its tiles. Sliding a tile only changes two keys, so the hash is updated in O(1)
+# whatever the board size. The blank is left out since its position is implied by the other tiles.
+
+_keys = {}
+
+def zobrist_keys(n):
+    # keys[tile * n * n + pos]; seeded by n so hashes are stable between runs and processes
+    keys = _keys.get(n)
+    if keys is None:
+        rng = random.Random(n)
+        keys = _keys[n] = array('Q', [rng.getrandbits(64) for _ in range(n ** 4)])
+    return keys
+
+def hash_tiles(tiles, n):
+    keys = zobrist_keys(n)
+    size = n * n
+    key = 0
+    for pos, tile in enumerate(tiles):
+        if tile != 0:
+            key ^= keys[tile * size + pos]
+    return key
+
+def hash_state(state):
+    return hash_tiles([tile for row in state for tile in row], len(state))